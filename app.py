@@ -1,26 +1,72 @@
-from flask import Flask
+from flask import Flask, make_response
 # 🚨 extensions.py에서 기존 'swagger'를 제거하고 'db', 'cors'만 사용합니다.
-from extensions import db, cors 
+from extensions import db, cors, cache
 from blueprints.api_v1 import api_v1
+from models import ActivityRecord
 from flask_jwt_extended import JWTManager
 import os
+import orjson
+from sqlalchemy.engine import make_url
 # 1. Flask-RESTX의 Api 클래스 임포트
 from flask_restx import Api 
 
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX 응답을 표준 json 대신 orjson으로 직렬화합니다."""
+    resp = make_response(orjson.dumps(data), code)
+    resp.headers.extend(headers or {})
+    resp.mimetype = 'application/json'
+    return resp
+
+
 def create_app():
     app = Flask(__name__)
 
-    # DB 설정
+    # DB 설정 (DATABASE_URL 환경 변수가 없으면 프로젝트 폴더의 SQLite 파일 사용)
     basedir = os.path.abspath(os.path.dirname(__file__))
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'data.db')
+    database_uri = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(basedir, 'data.db'))
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    url = make_url(database_uri)
+    engine_options = {}
+    if url.get_backend_name() == 'sqlite':
+        # 스레드 워커에서는 풀의 연결을 여러 스레드가 번갈아 쓰므로 check_same_thread를 끕니다.
+        engine_options['connect_args'] = {'check_same_thread': False}
+        # 메모리 DB는 Flask-SQLAlchemy가 연결 하나를 공유하는 StaticPool을 쓰므로 풀 크기 옵션을 받지 않습니다.
+        use_queue_pool = url.database not in (None, '', ':memory:') and url.query.get('mode') != 'memory'
+    else:
+        # 서버 DB는 유휴 연결을 끊을 수 있으므로 꺼낼 때 확인하고 주기적으로 교체합니다. (SQLite 파일 연결은 끊기지 않음)
+        engine_options['pool_pre_ping'] = True
+        engine_options['pool_recycle'] = 1800
+        use_queue_pool = True
+    if use_queue_pool:
+        # 연결을 풀에 유지해 SQLite 페이지 캐시를 요청 간에 재사용합니다.
+        # LIFO로 꺼내 최근에 쓴(캐시가 따뜻한) 연결을 우선 재사용하고, 남는 연결은 유휴 상태로 둡니다.
+        engine_options.update(pool_size=20, max_overflow=40, pool_use_lifo=True)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
     
-    # 🔑 JWT 설정
-    app.config['JWT_SECRET_KEY'] = 'super-secret-jwt-key-replace-me'
-    
+    # 🔑 JWT 설정: 서명 키는 코드에 두지 않고 JWT_SECRET_KEY 환경 변수로만 받습니다.
+    jwt_secret_key = os.environ.get('JWT_SECRET_KEY')
+    if not jwt_secret_key:
+        raise RuntimeError('JWT_SECRET_KEY 환경 변수를 설정해야 합니다.')
+    app.config['JWT_SECRET_KEY'] = jwt_secret_key
+    # 서명/검증 알고리즘을 HS256 하나로 고정합니다.
+    app.config['JWT_ALGORITHM'] = 'HS256'
+    app.config['JWT_DECODE_ALGORITHMS'] = ['HS256']
+
+    # 응답 캐시 설정: REDIS_URL이 주어지면 모든 워커가 공유하는 Redis 캐시를 사용합니다.
+    # 워커별 메모리 캐시는 다른 워커의 무효화를 알 수 없으므로, Redis가 없으면 캐시를 끕니다.
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url:
+        app.config['CACHE_TYPE'] = 'RedisCache'
+        app.config['CACHE_REDIS_URL'] = redis_url
+    else:
+        app.config['CACHE_TYPE'] = 'NullCache'
+
     # 확장 초기화
     db.init_app(app)
     cors.init_app(app)
+    cache.init_app(app)
     # 2. 기존 swagger.init_app(app) 제거
 
     # JWTManager 초기화
@@ -35,6 +81,8 @@ def create_app():
         description='사용자의 활동 기록 및 인증을 위한 API 문서',
         doc='/apidocs/' # Swagger UI가 표시될 경로
     )
+    # 리소스가 반환한 dict/list는 이 함수를 거쳐 JSON으로 직렬화됩니다.
+    api.representations['application/json'] = output_json
 
     # 4. JWT 인증을 위한 Security Definition 추가 (선택 사항이지만 권장됨)
     # 이는 Swagger UI에서 토큰을 입력할 수 있게 해줍니다.
@@ -55,10 +103,17 @@ def create_app():
     return app
 
 
+if __name__ == '__main__':
+    # 로컬 개발 서버(python app.py)에서만 키가 없을 때 개발용 키를 사용합니다. (Gunicorn 등에서 import할 때는 적용되지 않음)
+    os.environ.setdefault('JWT_SECRET_KEY', 'dev-only-jwt-key')
+
 app = create_app()
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        # create_all()은 이미 있는 테이블에 새 인덱스를 추가하지 않으므로 따로 생성합니다.
+        for index in ActivityRecord.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
         print("✅ 모든 테이블 생성 완료")
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -1,20 +1,92 @@
 from flask_restx import Namespace, Resource, fields, reqparse
-from extensions import db
+from extensions import db, cache
 import datetime
+import sys
+import time
+import msgspec
+import orjson
+from collections import defaultdict
 from models import User, ActivityRecord # ActivityRecord 모델 사용 가정
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from werkzeug.exceptions import BadRequest
 from functools import wraps
-from flask import jsonify, request # JSONIFY 및 request는 flask에서 계속 사용
+from flask import current_app, g, jsonify, request # JSONIFY 및 request는 flask에서 계속 사용
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from ciso8601 import parse_datetime
 
 # --- Flask-RESTX 네임스페이스 생성 ---
 # 기존 Blueprint를 대체하며, API 경로와 설명을 지정합니다.
 api_v1 = Namespace("api_v1", description="활동 기록 및 사용자 관리 API", path="/v1/api")
 
-# current_user_id 함수 (변경 없음)
+# current_user_id 함수
 def current_user_id():
-    """JWT 토큰에서 사용자 ID를 추출합니다."""
-    # get_jwt_identity()는 문자열을 반환하므로 int로 변환
-    return int(get_jwt_identity())
+    """JWT 토큰에서 사용자 ID를 추출합니다. 요청당 한 번만 변환하고 g에 보관합니다."""
+    user_id = getattr(g, '_current_user_id', None)
+    if user_id is None:
+        # get_jwt_identity()는 문자열을 반환하므로 int로 변환
+        user_id = g._current_user_id = int(get_jwt_identity())
+    return user_id
+
+# ISO 8601 파서를 모듈 로드 시 한 번만 골라 바인딩합니다. (요청마다 속성 조회/분기 없음)
+# Python 3.11부터 datetime.fromisoformat이 'Z' 접미사를 포함한 ISO 8601을 직접 파싱하고, 그 미만에서는 ciso8601을 사용합니다.
+_parse_iso = datetime.datetime.fromisoformat if sys.version_info >= (3, 11) else parse_datetime
+
+def parse_timestamp(value):
+    """ISO 8601 문자열을 저장 형식인 naive UTC datetime으로 변환합니다.
+
+    오프셋이 있는 값('Z', '+09:00' 등)은 UTC로 바꾼 뒤 tzinfo를 떼어, 오프셋 없는 값과 섞여도 빼기/비교가 가능합니다.
+    형식이 잘못되었으면 ValueError를 발생시킵니다.
+    """
+    parsed = _parse_iso(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def json_body():
+    """요청 본문(JSON 객체)을 orjson으로 파싱합니다."""
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        raise BadRequest('JSON 형식이 올바르지 않습니다.')
+    if not isinstance(data, dict):
+        raise BadRequest('JSON 객체가 필요합니다.')
+    return data
+
+# --- 응답 캐시 ---
+# 조회 결과는 짧은 시간 동안 캐시합니다. 키에 사용자별 캐시 버전을 넣어 두고,
+# 기록이 바뀌면 버전만 갱신해서 해당 사용자의 캐시를 한 번에 무효화합니다.
+CACHE_TIMEOUT = 30
+
+def user_cache_key(user_id, name, *params):
+    """사용자의 현재 캐시 버전이 포함된 캐시 키를 만듭니다."""
+    version = cache.get(f'cache_version:{user_id}') or 0
+    return ':'.join(str(part) for part in (name, user_id, version, *params))
+
+def request_cache_key(name):
+    """cache.cached()용 키 함수: 현재 사용자와 쿼리 문자열로 조회 응답의 캐시 키를 만듭니다."""
+    def make_cache_key(*args, **kwargs):
+        return user_cache_key(current_user_id(), name, request.query_string.decode())
+    return make_cache_key
+
+def cache_ok_response(rv):
+    """성공(200) 응답만 캐시합니다.
+
+    reqparse 검증 실패 등으로 HTTPException이 처리되면 (data, status) 튜플 대신 Response 객체가 전달됩니다.
+    """
+    return isinstance(rv, tuple) and rv[1] == 200
+
+def invalidate_user_cache(user_id):
+    """사용자의 기록이 바뀌었을 때 캐시된 조회 결과를 무효화합니다.
+
+    커밋이 끝난 뒤 호출합니다. 캐시 서버 오류는 로그만 남기고 넘어가므로, 이미 저장된 쓰기가 실패(500)로 응답되지 않습니다.
+    (무효화에 실패하면 이전 조회 결과가 최대 CACHE_TIMEOUT초 동안 보일 수 있습니다)
+    """
+    try:
+        # 버전 키가 이전 버전의 캐시 항목보다 먼저 만료되지 않도록 TTL을 넉넉히 줍니다.
+        cache.set(f'cache_version:{user_id}', time.time_ns(), timeout=CACHE_TIMEOUT * 2)
+    except Exception:
+        current_app.logger.exception('사용자 %s의 캐시 무효화 실패', user_id)
 
 # JWT 인증 데코레이터 (필요 시 사용자 정의)
 # 여기서는 `jwt_required()`를 직접 사용합니다.
@@ -39,10 +111,15 @@ activity_input_model = api_v1.model('ActivityInput', {
     'start_time': fields.String(required=True, description='시작 시간 (ISO 8601 형식)'),
     'end_time': fields.String(required=True, description='종료 시간 (ISO 8601 형식)'),
     'app': fields.String(required=True, description='앱 이름'),
-    'duration_seconds': fields.Integer(required=True, description='활동 시간 (초)'),
+    'duration_seconds': fields.Integer(description='(선택, 무시됨) 활동 시간은 시작/종료 시간으로 서버에서 계산합니다.'),
     'memo': fields.String(description='메모'),
 })
 
+activity_page_model = api_v1.model('ActivityPage', {
+    'items': fields.List(fields.Nested(activity_record_model), description='활동 기록 목록 (최신순)'),
+    'next_cursor': fields.String(description='다음 페이지 조회용 커서 (마지막 페이지이면 null)'),
+})
+
 user_model = api_v1.model('User', {
     'id': fields.Integer(readonly=True, description='사용자 ID'),
     'username': fields.String(required=True, description='사용자 이름'),
@@ -61,6 +138,43 @@ activity_summary_model = api_v1.model('ActivitySummary', {
     'records': fields.List(fields.Nested(activity_record_model), description='해당 활동의 최근 기록 목록')
 })
 
+# --- 요청 본문 스키마 (msgspec) ---
+# 요청 바이트를 C 확장에서 한 번에 디코딩·타입 검증합니다.
+# 시간 값은 문자열로 받아 _parse_iso로 변환합니다. msgspec의 datetime은 엄격한 RFC 3339만 허용하므로
+# 기존 클라이언트가 보내던 '2026-10-14T10:00'(초 생략)이나 '2026-10-14'(날짜만) 같은 형식도 계속 받기 위함입니다.
+# duration_seconds는 받지 않고 항상 시작/종료 시간으로 계산합니다. (보내더라도 무시됩니다)
+class ActivityIn(msgspec.Struct):
+    title: str
+    start_time: str
+    end_time: str
+    app: str
+    memo: str | None = None
+
+# 부분 수정(PUT)용 스키마: 본문에 없는 필드는 UNSET으로 남아 기존 값을 유지합니다.
+class ActivityPatch(msgspec.Struct):
+    title: str | msgspec.UnsetType = msgspec.UNSET
+    app: str | msgspec.UnsetType = msgspec.UNSET
+    start_time: str | msgspec.UnsetType = msgspec.UNSET
+    end_time: str | msgspec.UnsetType = msgspec.UNSET
+    memo: str | None | msgspec.UnsetType = msgspec.UNSET
+
+def activity_values(activity, user_id):
+    """ActivityIn을 ActivityRecord 컬럼 값 dict로 변환합니다. 활동 시간은 시작/종료 시간으로 계산합니다.
+
+    시간 형식이 잘못되었으면 ValueError를 발생시킵니다.
+    """
+    start_time = parse_timestamp(activity.start_time)
+    end_time = parse_timestamp(activity.end_time)
+    return {
+        'title': activity.title,
+        'app': activity.app,
+        'start_time': start_time,
+        'end_time': end_time,
+        'duration_seconds': int((end_time - start_time).total_seconds()),
+        'memo': activity.memo,
+        'user_id': user_id,
+    }
+
 # --- ActivityRecord 리소스 (통합) ---
 
 @api_v1.route('/activity')
@@ -73,52 +187,156 @@ class ActivityList(Resource):
     @jwt_required()
     def post(self):
         """🚨 활동 기록 추가 (수동/자동 모두 처리)"""
-        data = request.json
         user_id = current_user_id()
-        
-        required_fields = ['title', 'start_time', 'end_time', 'app', 'duration_seconds']
-        if not all(field in data for field in required_fields):
-            return {'error': '필수 필드(title, start_time, end_time, app, duration_seconds) 누락'}, 400
 
         try:
-            # 기존 Flask 코드 로직 유지
-            start_time_obj = datetime.datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-            end_time_obj = datetime.datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
-            duration_from_time = (end_time_obj - start_time_obj).total_seconds()
-            
-            new_record = ActivityRecord(
-                title=data['title'],
-                app=data['app'],
-                start_time=start_time_obj,
-                end_time=end_time_obj,
-                duration_seconds=int(duration_from_time),
-                memo=data.get('memo'),
-                user_id=user_id
-            )
+            activity = msgspec.json.decode(request.get_data(), type=ActivityIn)
+        except msgspec.DecodeError as e:
+            return {'error': f'요청 형식 오류: {e}'}, 400
+
+        try:
+            values = activity_values(activity, user_id)
+        except ValueError as e:
+            return {'error': f'시간 형식 오류: {e}'}, 400
+
+        try:
+            new_record = ActivityRecord(**values)
             db.session.add(new_record)
             db.session.commit()
-            return {'message': '활동 기록 추가 성공', 'record': new_record.to_dict()}, 201
         except Exception as e:
             db.session.rollback()
             return {'error': str(e)}, 500
 
+        invalidate_user_cache(user_id)
+        return {'message': '활동 기록 추가 성공', 'record': new_record.to_dict()}, 201
+
+# 목록 조회 페이지 크기 (기본값, 최대값)
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+# 일괄 추가 한 번에 받을 수 있는 최대 기록 수 (한 트랜잭션이 너무 길어지지 않도록 제한)
+MAX_BULK_ITEMS = 1000
+
 @api_v1.route('/activities')
 class ActivityListAll(Resource):
     @api_v1.doc(security='jwt')
-    @api_v1.response(200, '모든 활동 기록 조회 성공', [activity_record_model])
+    @api_v1.param('limit', f'한 번에 조회할 기록 수 (기본값 {DEFAULT_PAGE_LIMIT}, 최대 {MAX_PAGE_LIMIT})', type=int)
+    @api_v1.param('cursor', '이전 응답의 next_cursor 값 (다음 페이지 조회 시)')
+    @api_v1.param('before', '이 시각(ISO 8601) 이전에 끝난 기록만 조회')
+    @api_v1.response(200, '활동 기록 조회 성공', activity_page_model)
+    @api_v1.response(400, '잘못된 cursor 또는 before 값')
     @api_v1.response(401, '인증 실패')
     @jwt_required()
+    @cache.cached(timeout=CACHE_TIMEOUT, make_cache_key=request_cache_key('activities'), response_filter=cache_ok_response)
     def get(self):
-        """🚨 모든 활동 기록 조회"""
+        """🚨 활동 기록 조회 (최신순, 커서 기반 페이지네이션)"""
         user_id = current_user_id()
+        parser = reqparse.RequestParser()
+        parser.add_argument('limit', type=int, default=DEFAULT_PAGE_LIMIT, location='args')
+        parser.add_argument('cursor', type=str, location='args')
+        parser.add_argument('before', type=str, location='args')
+        args = parser.parse_args()
+
+        limit = min(max(args['limit'], 1), MAX_PAGE_LIMIT)
+        cursor = args['cursor']
+        before = args['before']
+
         # 최신 기록이 위로 오도록 내림차순 정렬
-        records = ActivityRecord.query.filter_by(user_id=user_id).order_by(ActivityRecord.end_time.desc()).all()
-        return [r.to_dict() for r in records], 200
+        # ORM 객체를 만들지 않고 응답에 필요한 컬럼만 Core select로 조회합니다. (to_dict()와 같은 키)
+        stmt = select(
+            ActivityRecord.id,
+            ActivityRecord.title,
+            ActivityRecord.app,
+            ActivityRecord.start_time,
+            ActivityRecord.end_time,
+            ActivityRecord.duration_seconds,
+            ActivityRecord.memo,
+            ActivityRecord.user_id,
+        ).where(ActivityRecord.user_id == user_id)
+        if cursor:
+            # cursor는 마지막으로 받은 기록의 'end_time,id' 입니다.
+            # OFFSET 없이 (user_id, end_time) 인덱스에서 바로 다음 위치부터 읽습니다.
+            try:
+                cursor_time, cursor_id = cursor.rsplit(',', 1)
+                cursor_key = (parse_timestamp(cursor_time), int(cursor_id))
+            except ValueError:
+                return {'error': '잘못된 cursor 값입니다.'}, 400
+            stmt = stmt.where(tuple_(ActivityRecord.end_time, ActivityRecord.id) < cursor_key)
+        if before:
+            # 특정 시각부터 거슬러 올라가며 조회할 때 사용하는 시작점 (cursor와 함께 쓰면 둘 다 적용)
+            try:
+                before_time = parse_timestamp(before)
+            except ValueError:
+                return {'error': '잘못된 before 값입니다.'}, 400
+            stmt = stmt.where(ActivityRecord.end_time < before_time)
+
+        # 다음 페이지가 있는지 알기 위해 한 개를 더 조회합니다.
+        stmt = stmt.order_by(ActivityRecord.end_time.desc(), ActivityRecord.id.desc()).limit(limit + 1)
+        rows = db.session.execute(stmt).mappings().all()
+        has_more = len(rows) > limit
+
+        items = [dict(row) for row in rows[:limit]]
+        result = {
+            'items': items,
+            'next_cursor': f"{items[-1]['end_time'].isoformat()},{items[-1]['id']}" if has_more else None,
+        }
+        return result, 200
+
+    @api_v1.doc(security='jwt')
+    @api_v1.expect([activity_input_model])
+    @api_v1.response(201, '활동 기록 일괄 추가 성공')
+    @api_v1.response(400, f'요청 오류 또는 {MAX_BULK_ITEMS}개 초과')
+    @api_v1.response(401, '인증 실패')
+    @jwt_required()
+    def post(self):
+        """🚨 활동 기록 일괄 추가 (오프라인에서 모아 둔 기록을 한 번의 트랜잭션으로 저장)"""
+        user_id = current_user_id()
+
+        try:
+            activities = msgspec.json.decode(request.get_data(), type=list[ActivityIn])
+        except msgspec.DecodeError as e:
+            return {'error': f'요청 형식 오류: {e}'}, 400
+
+        if len(activities) > MAX_BULK_ITEMS:
+            return {'error': f'한 번에 최대 {MAX_BULK_ITEMS}개까지 추가할 수 있습니다.'}, 400
+
+        mappings = []
+        for index, activity in enumerate(activities):
+            try:
+                mappings.append(activity_values(activity, user_id))
+            except ValueError as e:
+                return {'error': f'시간 형식 오류 ({index}번 항목): {e}'}, 400
+
+        try:
+            # ORM 객체를 만들지 않고 한 번의 executemany + 커밋으로 저장합니다.
+            db.session.bulk_insert_mappings(ActivityRecord, mappings)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {'error': str(e)}, 500
+
+        invalidate_user_cache(user_id)
+        return {'message': '활동 기록 일괄 추가 성공', 'count': len(mappings)}, 201
 
 @api_v1.route('/activity/<int:record_id>')
 @api_v1.param('record_id', '활동 기록 ID')
 class ActivityDetail(Resource):
     
+    @api_v1.doc(security='jwt')
+    @api_v1.response(200, '단일 활동 기록 조회 성공', activity_record_model)
+    @api_v1.response(404, '기록을 찾을 수 없거나 권한이 없습니다.')
+    @api_v1.response(401, '인증 실패')
+    @jwt_required()
+    def get(self, record_id):
+        """🚨 단일 활동 기록 상세 조회"""
+        user_id = current_user_id()
+        # 기본 키 조회는 세션의 identity map을 먼저 확인하고, 없을 때만 PK로 SELECT 합니다.
+        record = db.session.get(ActivityRecord, record_id)
+        
+        if record is None or record.user_id != user_id:
+            return {'error': '기록을 찾을 수 없거나 권한이 없습니다.'}, 404
+            
+        return record.to_dict(), 200
+
     @api_v1.doc(security='jwt')
     @api_v1.expect(activity_input_model, validate=False) # 부분 업데이트이므로 validate=False
     @api_v1.response(200, '활동 기록 업데이트 성공', activity_record_model)
@@ -128,39 +346,51 @@ class ActivityDetail(Resource):
     @jwt_required()
     def put(self, record_id):
         """🚨 활동 기록 수정"""
-        data = request.json
         user_id = current_user_id()
-        record = ActivityRecord.query.filter_by(id=record_id, user_id=user_id).first()
 
-        if not record:
+        # 허용된 필드만, 타입까지 한 번에 검증합니다. 형식 오류는 요청 오류(400)로 응답합니다.
+        try:
+            changes = msgspec.json.decode(request.get_data(), type=ActivityPatch)
+        except msgspec.DecodeError as e:
+            return {'error': f'요청 형식 오류: {e}'}, 400
+
+        record = db.session.get(ActivityRecord, record_id)
+
+        if record is None or record.user_id != user_id:
             return {'error': '기록을 찾을 수 없거나 권한이 없습니다.'}, 404
 
+        updates = {
+            name: value
+            for name, value in msgspec.structs.asdict(changes).items()
+            if value is not msgspec.UNSET
+        }
+        # 시간 변환과 활동 시간 계산은 커밋 전에 끝내, 잘못된 값은 서버 오류(500)가 아닌 요청 오류(400)로 응답합니다.
+        # parse_timestamp는 저장된 값과 같은 naive UTC를 돌려주므로 기존 값과 섞어 계산해도 안전합니다.
         try:
-            # 기존 Flask 코드 로직 유지
-            record.title = data.get('title', record.title)
-            record.app = data.get('app', record.app)
-            
-            start_time_str = data.get('start_time')
-            if start_time_str:
-                record.start_time = datetime.datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-            
-            end_time_str = data.get('end_time')
-            if end_time_str:
-                record.end_time = datetime.datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
+            for name in ('start_time', 'end_time'):
+                if name in updates:
+                    updates[name] = parse_timestamp(updates[name])
+        except ValueError as e:
+            return {'error': f'시간 형식 오류: {e}'}, 400
+
+        if 'start_time' in updates or 'end_time' in updates:
+            start_time = updates.get('start_time', record.start_time)
+            end_time = updates.get('end_time', record.end_time)
+            if start_time and end_time:
+                updates['duration_seconds'] = int((end_time - start_time).total_seconds())
 
-            record.memo = data.get('memo', record.memo)
+        try:
+            for name, value in updates.items():
+                setattr(record, name, value)
 
-            if start_time_str or end_time_str:
-                if record.start_time and record.end_time:
-                    duration = (record.end_time - record.start_time).total_seconds()
-                    record.duration_seconds = int(duration)
-            
             db.session.commit()
-            return {'message': '활동 기록 업데이트 성공', 'record': record.to_dict()}, 200
         except Exception as e:
             db.session.rollback()
             return {'error': str(e)}, 500
 
+        invalidate_user_cache(user_id)
+        return {'message': '활동 기록 업데이트 성공', 'record': record.to_dict()}, 200
+
     @api_v1.doc(security='jwt')
     @api_v1.response(200, '기록 삭제 성공')
     @api_v1.response(404, '기록을 찾을 수 없거나 권한이 없습니다.')
@@ -169,19 +399,22 @@ class ActivityDetail(Resource):
     def delete(self, record_id):
         """🚨 활동 기록 삭제"""
         user_id = current_user_id()
-        record = ActivityRecord.query.filter_by(id=record_id, user_id=user_id).first()
-
-        if not record:
-            return {'error': '기록을 찾을 수 없거나 권한이 없습니다.'}, 404
 
         try:
-            db.session.delete(record)
+            # 기록을 ORM 객체로 불러오지 않고 DELETE 한 번으로 삭제합니다. 삭제된 행 수로 존재 여부를 판단합니다.
+            deleted = ActivityRecord.query.filter_by(id=record_id, user_id=user_id).delete(synchronize_session=False)
+            if not deleted:
+                db.session.rollback()
+                return {'error': '기록을 찾을 수 없거나 권한이 없습니다.'}, 404
+
             db.session.commit()
-            return {'message': '기록 삭제 성공'}, 200
         except Exception as e:
             db.session.rollback()
             return {'error': str(e)}, 500
 
+        invalidate_user_cache(user_id)
+        return {'message': '기록 삭제 성공'}, 200
+
 # --- 사용자 리소스 ---
 
 @api_v1.route('/register')
@@ -191,21 +424,23 @@ class UserRegister(Resource):
     @api_v1.response(400, '요청 오류 또는 이미 존재하는 사용자')
     def post(self):
         """회원가입"""
-        data = request.json
+        data = json_body()
         username = data.get('username')
         password = data.get('password')
 
         if not username or not password:
             return {'error': 'username과 password 필수'}, 400
 
-        if User.query.filter_by(username=username).first():
-            return {'error': '이미 존재하는 사용자'}, 400
-
         user = User(username=username)
         user.set_password(password)
 
+        # 중복 확인용 SELECT 없이 username UNIQUE 제약으로 원자적으로 판별합니다.
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return {'error': '이미 존재하는 사용자'}, 400
 
         return {'message': '회원가입 성공'}, 201
 
@@ -217,7 +452,7 @@ class UserLogin(Resource):
     @api_v1.response(401, '아이디 또는 비밀번호가 잘못됨')
     def post(self):
         """로그인 (JWT 토큰 발행)"""
-        data = request.json
+        data = json_body()
         username = data.get('username')
         password = data.get('password')
 
@@ -254,6 +489,7 @@ class ActivitySummary(Resource):
         'daily_breakdown': fields.List(fields.Nested(daily_summary_model), description='일별 총 시간 집계'),
     }))
     @jwt_required()
+    @cache.cached(timeout=CACHE_TIMEOUT, make_cache_key=request_cache_key('summary'), response_filter=cache_ok_response)
     def get(self):
         """🚨 지난 N일간의 일별 총 활동 시간 및 주요 활동 목록 조회"""
         user_id = current_user_id()
@@ -262,107 +498,59 @@ class ActivitySummary(Resource):
         args = parser.parse_args()
         
         days = args['days']
-        
+
         # 1. 날짜 범위 설정
         now = datetime.datetime.utcnow()
         start_date = now - datetime.timedelta(days=days)
         
-        # 2. 범위 내 ActivityRecord 조회
-        records = ActivityRecord.query.filter(
-            ActivityRecord.user_id == user_id,
-            ActivityRecord.end_time >= start_date,
-        ).order_by(ActivityRecord.end_time.desc()).all()
-
-        # 3. 일별 총 시간 집계 (Daily Breakdown)
-        daily_seconds = {}
+        # 2. 범위 내 ActivityRecord를 (날짜, 제목) 단위로 SQL에서 바로 집계 (행 전체를 파이썬으로 가져오지 않음)
+        # date()는 SQLite에서는 'YYYY-MM-DD' 문자열을, PostgreSQL 등에서는 date 객체를 반환합니다.
+        record_date = func.date(ActivityRecord.end_time).label('date')
+        rows = (
+            db.session.query(record_date, ActivityRecord.title, func.sum(ActivityRecord.duration_seconds))
+            .filter(
+                ActivityRecord.user_id == user_id,
+                ActivityRecord.end_time >= start_date,
+            )
+            .group_by(record_date, ActivityRecord.title)
+            .all()
+        )
+
+        # 3. 한 번의 순회로 일별 합계, 활동 제목별 합계, 일별 스택 데이터를 함께 만듭니다.
+        daily_seconds = defaultdict(int)
+        title_seconds = defaultdict(int)
+        # { 'YYYY-MM-DD': { 'PintOS 구현': 3600, '알고리즘 문제 풀이': 1800, ... } }
+        daily_stack_breakdown = defaultdict(dict)
         # N일치 데이터 구조 초기화
         for i in range(days):
-            date = (now - datetime.timedelta(days=i)).date()
-            daily_seconds[date.isoformat()] = 0
-            
-        for record in records:
-            date_str = record.end_time.date().isoformat()
-            daily_seconds[date_str] = daily_seconds.get(date_str, 0) + record.duration_seconds
-            
+            date = (now - datetime.timedelta(days=i)).date().isoformat()
+            daily_seconds[date] = 0
+            daily_stack_breakdown[date] = {}
+
+        for record_day, title, seconds in rows:
+            # 어느 DB든 미리 채운 'YYYY-MM-DD' 문자열 키와 같은 키를 쓰도록 문자열로 맞춥니다.
+            date_str = str(record_day)
+            daily_seconds[date_str] += seconds
+            title_seconds[title] += seconds
+            daily_stack_breakdown[date_str][title] = seconds
+
+        # 일별 총 시간 집계 (Daily Breakdown)
         daily_breakdown = [
             {'date': date, 'total_seconds': seconds}
             for date, seconds in sorted(daily_seconds.items())
         ]
-        
-        # 4. 활동 제목별 총 시간 집계 (Top Activities for Chart/Legend)
-        activity_breakdown = {}
-        for record in records:
-            title = record.title
-            if title not in activity_breakdown:
-                activity_breakdown[title] = {
-                    'total_seconds': 0,
-                    'records': [] # 해당 활동의 모든 기록을 저장
-                }
-            activity_breakdown[title]['total_seconds'] += record.duration_seconds
-            activity_breakdown[title]['records'].append(record)
-            
-        # 상위 랭킹순으로 정렬
-        sorted_activities = sorted(
-            activity_breakdown.items(), 
-            key=lambda item: item[1]['total_seconds'], 
-            reverse=True
-        )
-        
-        top_activities = []
-        for title, data in sorted_activities:
-            # 기록은 최신 3개만 반환
-            recent_records = sorted(data['records'], key=lambda r: r.end_time, reverse=True)[:3]
-            
-            # 여기서 ActivityRecord 대신 ActivitySummaryItem 모델을 반환하도록 설계 변경 가능
-            # 현재는 단순화를 위해 title과 total_seconds만 반환하고, 클라이언트에서 처리하도록 합니다.
-            top_activities.append({
-                'title': title,
-                'total_seconds': data['total_seconds'],
-                # 클라이언트의 차트 로직을 위해 records를 반환하면 좋지만, 데이터가 너무 커지므로
-                # 일단 records 필드는 제거하고 title과 total_seconds만 반환합니다.
-                # 'records': [r.to_dict() for r in recent_records] 
-            })
-
-        # --- 차트 데이터 구조를 위한 추가 집계 ---
-        # 클라이언트에서 스택형 차트를 그리기 위해, 일별 활동 데이터를 상세하게 제공합니다.
-        
-        # Daily Stack Breakdown
-        daily_stack_breakdown = {}
-        for i in range(days):
-            date = (now - datetime.timedelta(days=i)).date().isoformat()
-            daily_stack_breakdown[date] = {}
-        
-        # { 'YYYY-MM-DD': { 'PintOS 구현': 3600, '알고리즘 문제 풀이': 1800, ... } }
-        for record in records:
-            date_str = record.end_time.date().isoformat()
-            title = record.title
-            daily_stack_breakdown[date_str] = daily_stack_breakdown.get(date_str, {})
-            daily_stack_breakdown[date_str][title] = daily_stack_breakdown[date_str].get(title, 0) + record.duration_seconds
 
+        # 4. 활동 제목별 총 시간 집계 (Top Activities for Chart/Legend), 상위 랭킹순으로 정렬
+        # 클라이언트의 차트 로직을 위해 records를 반환하면 좋지만, 데이터가 너무 커지므로
+        # title과 total_seconds만 반환하고, 클라이언트에서 처리하도록 합니다.
+        top_activities = [
+            {'title': title, 'total_seconds': seconds}
+            for title, seconds in sorted(title_seconds.items(), key=lambda item: (-item[1], item[0]))
+        ]
+
+        # 클라이언트에서 스택형 차트를 그리기 위해, 일별 활동 데이터를 상세하게 제공합니다.
         return {
             'daily_total_summary': daily_breakdown, # 일별 총 시간 (선 그래프나 요약용)
             'top_activities': top_activities,       # 상위 활동 목록 (범례용)
-            'daily_stack_breakdown': daily_stack_breakdown, # 일별 스택 차트 데이터
+            'daily_stack_breakdown': dict(daily_stack_breakdown), # 일별 스택 차트 데이터
         }, 200
-
-# --- 단일 기록 상세 조회 기능 추가 ---
-@api_v1.route('/activity/<int:record_id>')
-# ... (ActivityDetail 클래스 유지 및 get 메서드 추가) ...
-class ActivityDetail(Resource):
-    
-    # ... (put, delete 메서드 유지) ...
-    
-    @api_v1.doc(security='jwt')
-    @api_v1.response(200, '단일 활동 기록 조회 성공', activity_record_model)
-    @api_v1.response(404, '기록을 찾을 수 없거나 권한이 없습니다.')
-    @api_v1.response(401, '인증 실패')
-    @jwt_required()
-    def get(self, record_id):
-        """🚨 단일 활동 기록 상세 조회"""
-        user_id = current_user_id()
-        record = ActivityRecord.query.filter_by(id=record_id, user_id=user_id).first()
-        
-        if not record:
-            return {'error': '기록을 찾을 수 없거나 권한이 없습니다.'}, 404
-            
-        return record.to_dict(), 200
\ No newline at end of file
@@ -1,7 +1,31 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flasgger import Swagger
+from flask_caching import Cache
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
-db = SQLAlchemy()
+# 쓰기 경로는 모두 명시적으로 commit()(= flush)하므로, 조회마다 일어나는 autoflush 검사를 끕니다.
+db = SQLAlchemy(session_options={'autoflush': False})
 cors = CORS()
 swagger = Swagger()
+cache = Cache()
+
+
+# SQLite 연결이 열릴 때마다 성능 관련 PRAGMA를 적용합니다.
+# WAL 모드에서는 쓰기 중에도 읽기가 막히지 않고, synchronous=NORMAL로 커밋마다의 fsync를 줄입니다.
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-20000")  # 약 20MB 페이지 캐시
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA foreign_keys=ON")  # ON DELETE CASCADE 적용 (SQLite는 기본값 OFF)
+    cursor.close()
@@ -0,0 +1,22 @@
+import multiprocessing
+import os
+
+# 🚨 운영 환경 Gunicorn 설정 (gunicorn -c gunicorn.conf.py app:app)
+# Werkzeug 개발 서버(app.run)는 운영 부하를 감당하지 못하므로 Gunicorn으로 실행합니다.
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# CPU 코어 수 기준 권장 워커 수 (2 * CPU + 1)
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# 스레드 워커: DB I/O 대기 중에도 다른 요청을 처리하고, 비밀번호 해싱(argon2)은 GIL을 놓으므로
+# 동시 로그인이 한 워커를 막지 않고 여러 코어에서 처리됩니다. (gevent는 CPU 작업 동안 이벤트 루프가 멈춤)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# 마스터에서 앱을 한 번만 불러온 뒤 fork하여, 워커들이 코드/ORM 매퍼를 copy-on-write로 공유합니다.
+preload_app = True
+
+# 일정 요청 수마다 워커를 재시작해 메모리 증가를 막습니다. (jitter로 동시 재시작 방지)
+max_requests = 1000
+max_requests_jitter = 100
@@ -1,6 +1,10 @@
 from extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
-import datetime
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+# 비밀번호 해시는 argon2id 사용 (C 구현이 해싱 중 GIL을 놓으므로 동시 로그인이 여러 코어에서 처리됩니다)
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -12,14 +16,22 @@ class User(db.Model):
     # app_usages = db.relationship('AppUsage', backref='user', lazy=True)
     
     # 🚨 ActivityRecord 관계 추가
-    activity_records = db.relationship('ActivityRecord', backref='user', lazy=True)
+    # 사용자 삭제 시 기록은 DB의 ON DELETE CASCADE로 한 번에 지웁니다. (기록을 불러와 하나씩 삭제하지 않음)
+    # 로그인 등에서 User를 조회할 때 전체 기록까지 읽지 않도록 lazy 로딩은 유지합니다.
+    activity_records = db.relationship('ActivityRecord', backref='user', lazy=True, passive_deletes=True)
 
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # argon2 도입 이전에 가입한 사용자의 비밀번호는 기존 werkzeug 해시로 검증합니다.
+        if not self.password_hash.startswith('$argon2'):
+            return check_password_hash(self.password_hash, password)
+        try:
+            return password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
 
     def to_dict(self):
         return {'id': self.id, 'username': self.username}
@@ -27,13 +39,23 @@ class User(db.Model):
 
 # 🚨 ActivityRecord 모델 (TimeRecord + AppUsage 통합)
 class ActivityRecord(db.Model):
+    # 목록/요약 조회는 항상 user_id로 거르고 end_time으로 정렬·범위 조회하므로 복합 인덱스를 둡니다.
+    # - ix_activity_user_end: 목록 조회 (end_time DESC, id DESC). SQLite는 인덱스를 역방향으로 읽으므로
+    #   오름차순으로 둡니다. DESC로 만들면 rowid(id) 순서가 어긋나 정렬을 다시 하게 됩니다.
+    # - ix_activity_user_end_summary: 요약 집계에 필요한 컬럼을 모두 포함해 테이블을 읽지 않고 인덱스만으로 처리합니다.
+    __table_args__ = (
+        db.Index('ix_activity_user_end', 'user_id', 'end_time'),
+        db.Index('ix_activity_user_end_summary', 'user_id', 'end_time', 'title', 'duration_seconds'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     
     # 🚨 공통 필드 (TimeRecord의 title, AppUsage의 app_name을 포함)
     title = db.Column(db.String(100), nullable=False) # 제목
     app = db.Column(db.String(100), nullable=False) # 앱 이름
-    start_time = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
-    end_time = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    # 값이 빠진 경우 DB가 직접 현재 시각(UTC)을 채웁니다.
+    start_time = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+    end_time = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
     duration_seconds = db.Column(db.Integer, nullable=False, default=0)
     
     # 🚨 TimeRecord 전용 필드
@@ -43,15 +65,16 @@ class ActivityRecord(db.Model):
     # app_name 필드는 title로 통합하여 사용
     # app_category = db.Column(db.String(50), nullable=True) # 확장성을 위한 카테고리 (현재는 사용 안함)
 
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
 
     def to_dict(self):
+        # datetime은 응답 직렬화(orjson)에서 ISO 8601 문자열로 바로 변환되므로 isoformat()을 호출하지 않습니다.
         return {
             'id': self.id,
             'title': self.title,
             'app': self.app, # 타입 추가
-            'start_time': self.start_time.isoformat() if self.start_time else None,
-            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
             'duration_seconds': self.duration_seconds,
             'memo': self.memo,
             'user_id': self.user_id